@@ -4,7 +4,6 @@ import logging
 
 import aws_cdk as cdk
 
-from infra.pipeline_product_stack import BatchPipelineStack, DeployPipelineStack
 from infra.service_catalog_stack import ServiceCatalogStack
 
 # Configure the logger
@@ -18,8 +17,6 @@ app = cdk.App()
 artifact_bucket = app.node.try_get_context("drift:ArtifactBucket")
 artifact_bucket_prefix = app.node.try_get_context("drift:ArtifactBucketPrefix")
 
-
-
 # Create the SC stack
 synth = cdk.DefaultStackSynthesizer(
     file_assets_bucket_name=artifact_bucket,
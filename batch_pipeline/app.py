@@ -3,9 +3,11 @@ import argparse
 import json
 import logging
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-# Import the pipeline
-from pipelines.pipeline import get_pipeline, upload_pipeline
+# Import the pipeline cache, the pipeline itself is imported on a cache miss
+from pipelines.cache import get_cached_pipeline, get_pipeline_digest, put_cached_pipeline
 
 from aws_cdk import core
 from infra.batch_config import BatchConfig
@@ -13,60 +15,103 @@ from infra.sagemaker_pipeline_stack import SageMakerPipelineStack
 from infra.model_registry import ModelRegistry
 
 
-# Configure the logger
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
 
 
-registry = ModelRegistry()
+def load_batch_config(stage_name: str) -> BatchConfig:
+    # Get the stage specific deployment config for sagemaker
+    with open(f"{stage_name}-config.json", "r") as f:
+        return BatchConfig(**json.load(f))
 
 
-def create_pipeline(
-    app: core.App,
-    project_name: str,
-    project_id: str,
-    region: str,
-    sagemaker_pipeline_role_arn: str,
-    artifact_bucket: str,
-    evaluate_drift_function_arn: str,
-    stage_name: str,
+def select_model_packages(
+    registry: ModelRegistry,
+    package_group_name: str,
+    batch_configs: list,
 ):
-    # Get the stage specific deployment config for sagemaker
-    with open(f"{stage_name}-config.json", "r") as f:
-        j = json.load(f)
-        batch_config = BatchConfig(**j)
+    """Sets the model package version and arn for each stage's batch config.
 
-    # Set the model package group to project name
-    package_group_name = project_name
+    Stages share a single registry lookup for the latest approved package, and
+    a single lookup for all explicitly configured versions.
+    """
+    latest_configs = [c for c in batch_configs if c.model_package_version is None]
+    versioned_configs = [c for c in batch_configs if c.model_package_version is not None]
 
     # If we don't have a specific champion variant defined, get the latest approved
-    if batch_config.model_package_version is None:
+    if latest_configs:
         logger.info("Selecting latest approved")
         p = registry.get_latest_approved_packages(package_group_name, max_results=1)[0]
-        batch_config.model_package_version = p["ModelPackageVersion"]
-        batch_config.model_package_arn = p["ModelPackageArn"]
-    else:
-        # Get the versioned package and update ARN
-        logger.info(f"Selecting variant version {batch_config.model_package_version}")
-        p = registry.get_versioned_approved_packages(
+        for batch_config in latest_configs:
+            batch_config.model_package_version = p["ModelPackageVersion"]
+            batch_config.model_package_arn = p["ModelPackageArn"]
+
+    # Get the versioned packages and update ARNs
+    if versioned_configs:
+        versions = [c.model_package_version for c in versioned_configs]
+        logger.info(f"Selecting variant versions {versions}")
+        packages = registry.get_versioned_approved_packages(
             package_group_name,
-            model_package_versions=[batch_config.model_package_version],
-        )[0]
-        batch_config.model_package_arn = p["ModelPackageArn"]
+            model_package_versions=versions,
+        )
+        package_arns = {p["ModelPackageVersion"]: p["ModelPackageArn"] for p in packages}
+        for batch_config in versioned_configs:
+            if batch_config.model_package_version not in package_arns:
+                raise Exception(
+                    f"No approved package found for: {package_group_name} and version: "
+                    f"{batch_config.model_package_version}"
+                )
+            batch_config.model_package_arn = package_arns[batch_config.model_package_version]
 
-    # Set the default input data uri
-    data_uri = f"s3://{artifact_bucket}/{project_id}/batch/{stage_name}"
 
-    # set the output transform uri
-    transform_uri = f"s3://{artifact_bucket}/{project_id}/transform/{stage_name}"
+def get_model_artifacts(registry: ModelRegistry, batch_configs: list) -> dict:
+    """Gets the model and baseline uri for each selected model package arn.
+
+    Stages selecting the same model package share one set of registry lookups,
+    made before the stages run concurrently.
+    """
+    model_artifacts = {}
+    for batch_config in batch_configs:
+        model_package_arn = batch_config.model_package_arn
+        if model_package_arn not in model_artifacts:
+            # Get the pipeline execution to get the model uri
+            pipeline_execution_arn = registry.get_pipeline_execution_arn(model_package_arn)
+            logger.info(f"Got pipeline exection arn: {pipeline_execution_arn}")
+            model_uri = registry.get_model_artifact(pipeline_execution_arn)
+            logger.info(f"Got model uri: {model_uri}")
+            model_artifacts[model_package_arn] = {"model_uri": model_uri, "baseline_uri": None}
+
+        # If we have drift configuration then get the baseline uri
+        artifacts = model_artifacts[model_package_arn]
+        if batch_config.drift_config is not None and artifacts["baseline_uri"] is None:
+            artifacts["baseline_uri"] = registry.get_data_check_baseline_uri(model_package_arn)
+            logger.info(f"Got baseline uri: {artifacts['baseline_uri']}")
+    return model_artifacts
 
-    # Get the pipeline execution to get the baseline uri
-    pipeline_execution_arn = registry.get_pipeline_execution_arn(
-        batch_config.model_package_arn
-    )
-    logger.info(f"Got pipeline exection arn: {pipeline_execution_arn}")
-    model_uri = registry.get_model_artifact(pipeline_execution_arn)
-    logger.info(f"Got model uri: {model_uri}")
+
+def create_pipeline(
+    model_artifacts: dict,
+    batch_config: BatchConfig,
+    project_name: str,
+    project_id: str,
+    region: str,
+    sagemaker_pipeline_role_arn: str,
+    artifact_bucket: str,
+    evaluate_drift_function_arn: str,
+    stage_name: str,
+) -> dict:
+    """Uploads the batch pipeline for a stage's selected model package.
+
+    Only makes boto3 calls so stages can run concurrently; CDK constructs
+    are created from the returned stack properties on the main thread.
+    """
+    # Set the default input data and output transform uris under the project prefix
+    project_uri = f"s3://{artifact_bucket}/{project_id}"
+    data_uri = f"{project_uri}/batch/{stage_name}"
+    transform_uri = f"{project_uri}/transform/{stage_name}"
+
+    # Get the model uri resolved for the selected model package
+    artifacts = model_artifacts[batch_config.model_package_arn]
+    model_uri = artifacts["model_uri"]
 
     # Set the sagemaker pipeline name and descrption with model version
     sagemaker_pipeline_name = f"{project_name}-batch-{stage_name}"
@@ -75,11 +120,9 @@ def create_pipeline(
     # If we have drift configuration then get the baseline uri
     baseline_uri = None
     if batch_config.drift_config is not None:
-        baseline_uri = registry.get_data_check_baseline_uri(batch_config.model_package_arn)
-        logger.info(f"Got baseline uri: {baseline_uri}")
+        baseline_uri = artifacts["baseline_uri"]
 
-    # Create batch pipeline
-    pipeline = get_pipeline(
+    pipeline_args = dict(
         region=region,
         role=sagemaker_pipeline_role_arn,
         pipeline_name=sagemaker_pipeline_name,
@@ -92,37 +135,67 @@ def create_pipeline(
         baseline_uri=baseline_uri,
     )
 
-    # Create the pipeline definition
-    logger.info("Creating/updating a SageMaker Pipeline for batch transform")
-    pipeline_definition_body = pipeline.definition()
-    parsed = json.loads(pipeline_definition_body)
-    logger.info(json.dumps(parsed, indent=2, sort_keys=True))
-
-    # Upload the pipeline to S3 bucket/key and return JSON with key/value for for Cfn Stack parameters.
-    # see: https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/aws-resource-sagemaker-pipeline.html
-    logger.info(f"Uploading {stage_name} pipeline to {artifact_bucket}")
-    pipeline_definition_key = upload_pipeline(
-        pipeline,
-        default_bucket=artifact_bucket,
-        base_job_prefix=f"{project_id}/batch-{stage_name}",
+    # Reuse the pipeline definition uploaded by a previous run with the same inputs
+    digest = get_pipeline_digest(**pipeline_args)
+    cache_key = f"{project_id}/batch-{stage_name}/pipeline-cache/{digest}.json"
+    pipeline_definition_key = get_cached_pipeline(artifact_bucket, cache_key)
+    if pipeline_definition_key is not None:
+        logger.info(f"Using cached {stage_name} pipeline: {pipeline_definition_key}")
+    else:
+        from pipelines.pipeline import get_pipeline, upload_pipeline
+
+        # Create batch pipeline
+        pipeline = get_pipeline(**pipeline_args)
+
+        # Create the pipeline definition
+        logger.info("Creating/updating a SageMaker Pipeline for batch transform")
+        pipeline_definition_body = pipeline.definition()
+        logger.info(f"Pipeline definition size: {len(pipeline_definition_body)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            parsed = json.loads(pipeline_definition_body)
+            logger.debug(json.dumps(parsed, indent=2, sort_keys=True))
+
+        # Upload the pipeline to S3 bucket/key and return JSON with key/value for for Cfn Stack parameters.
+        # see: https://docs.aws.amazon.com/AWSCloudFormation/latest/UserGuide/aws-resource-sagemaker-pipeline.html
+        logger.info(f"Uploading {stage_name} pipeline to {artifact_bucket}")
+        pipeline_definition_key = upload_pipeline(
+            pipeline,
+            pipeline_definition_body,
+            default_bucket=artifact_bucket,
+            base_job_prefix=f"{project_id}/batch-{stage_name}",
+        )
+        # The key is addressed by the definition's sha256, so an unchanged pipeline reuses it
+        logger.info(f"Pipeline definition key: {pipeline_definition_key}")
+        put_cached_pipeline(artifact_bucket, cache_key, pipeline_definition_key)
+
+    return dict(
+        pipeline_name=sagemaker_pipeline_name,
+        pipeline_description=sagemaker_pipeline_description,
+        pipeline_definition_bucket=artifact_bucket,
+        pipeline_definition_key=pipeline_definition_key,
+        sagemaker_role_arn=sagemaker_pipeline_role_arn,
+        drift_config=batch_config.drift_config,
     )
 
+
+def create_stack(
+    app: core.App,
+    project_name: str,
+    project_id: str,
+    stage_name: str,
+    **stack_props,
+):
     tags = [
         core.CfnTag(key="sagemaker:deployment-stage", value=stage_name),
         core.CfnTag(key="sagemaker:project-id", value=project_id),
         core.CfnTag(key="sagemaker:project-name", value=project_name),
     ]
 
-    SageMakerPipelineStack(
+    return SageMakerPipelineStack(
         app,
         f"drift-batch-{stage_name}",
-        pipeline_name=sagemaker_pipeline_name,
-        pipeline_description=sagemaker_pipeline_description,
-        pipeline_definition_bucket=artifact_bucket,
-        pipeline_definition_key=pipeline_definition_key,
-        sagemaker_role_arn=sagemaker_pipeline_role_arn,
         tags=tags,
-        drift_config=batch_config.drift_config,
+        **stack_props,
     )
 
 
@@ -133,55 +206,82 @@ def main(
     sagemaker_pipeline_role_arn: str,
     artifact_bucket: str,
     evaluate_drift_function_arn: str,
+    stage: str = None,
 ):
+    # Synthesize both stages unless a single stage is selected
+    stage_names = ["staging", "prod"]
+    if stage not in (None, "all"):
+        if stage not in stage_names:
+            raise Exception(f"Stage {stage} must be one of: all, {', '.join(stage_names)}")
+        stage_names = [stage]
+
     # Create App and stacks
     app = core.App()
 
-    create_pipeline(
-        app=app,
-        project_name=project_name,
-        project_id=project_id,
-        region=region,
-        sagemaker_pipeline_role_arn=sagemaker_pipeline_role_arn,
-        artifact_bucket=artifact_bucket,
-        evaluate_drift_function_arn=evaluate_drift_function_arn,
-        stage_name="staging",
-    )
+    registry = ModelRegistry()
 
-    create_pipeline(
-        app=app,
-        project_name=project_name,
-        project_id=project_id,
-        region=region,
-        sagemaker_pipeline_role_arn=sagemaker_pipeline_role_arn,
-        artifact_bucket=artifact_bucket,
-        evaluate_drift_function_arn=evaluate_drift_function_arn,
-        stage_name="prod",
-    )
+    # Load the stage configs up front so a bad config fails before any AWS calls
+    batch_configs = {stage_name: load_batch_config(stage_name) for stage_name in stage_names}
+
+    # Set the model package group to project name
+    select_model_packages(registry, project_name, list(batch_configs.values()))
+
+    # Resolve each selected model package once, before the stages run concurrently
+    model_artifacts = get_model_artifacts(registry, list(batch_configs.values()))
+
+    # Create the stage pipelines concurrently as they are I/O bound
+    with ThreadPoolExecutor(max_workers=len(batch_configs)) as executor:
+        futures = {
+            stage_name: executor.submit(
+                create_pipeline,
+                model_artifacts=model_artifacts,
+                batch_config=batch_config,
+                project_name=project_name,
+                project_id=project_id,
+                region=region,
+                sagemaker_pipeline_role_arn=sagemaker_pipeline_role_arn,
+                artifact_bucket=artifact_bucket,
+                evaluate_drift_function_arn=evaluate_drift_function_arn,
+                stage_name=stage_name,
+            )
+            for stage_name, batch_config in batch_configs.items()
+        }
+
+    # Create the stacks on the main thread in stage order
+    for stage_name, future in futures.items():
+        create_stack(
+            app,
+            project_name=project_name,
+            project_id=project_id,
+            stage_name=stage_name,
+            **future.result(),
+        )
 
     app.synth()
 
 
+# Map each argument to the environment variable providing its default
+ENV_ARGS = {
+    "region": "AWS_REGION",
+    "project_name": "SAGEMAKER_PROJECT_NAME",
+    "project_id": "SAGEMAKER_PROJECT_ID",
+    "sagemaker_pipeline_role_arn": "SAGEMAKER_PIPELINE_ROLE_ARN",
+    "evaluate_drift_function_arn": "EVALUATE_DRIFT_FUNCTION_ARN",
+    "artifact_bucket": "ARTIFACT_BUCKET",
+    "stage": "BATCH_STAGE",
+}
+
+
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Load parameters")
-    parser.add_argument("--region", default=os.environ.get("AWS_REGION"))
-    parser.add_argument(
-        "--project-name",
-        default=os.environ.get("SAGEMAKER_PROJECT_NAME"),
-    )
-    parser.add_argument("--project-id", default=os.environ.get("SAGEMAKER_PROJECT_ID"))
-    parser.add_argument(
-        "--sagemaker-pipeline-role-arn",
-        default=os.environ.get("SAGEMAKER_PIPELINE_ROLE_ARN"),
-    )
-    parser.add_argument(
-        "--evaluate-drift-function-arn",
-        default=os.environ.get("EVALUATE_DRIFT_FUNCTION_ARN"),
-    )
-    parser.add_argument(
-        "--artifact-bucket",
-        default=os.environ.get("ARTIFACT_BUCKET"),
-    )
-    args = vars(parser.parse_args())
+    # Configure the logger when run as a script, leaving importers' logging untouched
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
+
+    # Read arguments from the environment, only parsing the command line if given
+    args = {name: os.environ.get(env) for name, env in ENV_ARGS.items()}
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description="Load parameters")
+        for name in ENV_ARGS:
+            parser.add_argument(f"--{name.replace('_', '-')}", default=args[name])
+        args = vars(parser.parse_args())
     logger.info("args: {}".format(args))
     main(**args)
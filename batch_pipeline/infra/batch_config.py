@@ -1,4 +1,17 @@
+from typing import Union
+
+
 class DriftConfig:
+    __slots__ = (
+        "metric_name",
+        "metric_threshold",
+        "comparison_operator",
+        "period",
+        "evaluation_periods",
+        "datapoints_to_alarm",
+        "statistic",
+    )
+
     def __init__(
         self,
         metric_name: str,
@@ -19,6 +32,16 @@ class DriftConfig:
 
 
 class BatchConfig:
+    __slots__ = (
+        "stage_name",
+        "instance_count",
+        "instance_type",
+        "model_package_version",
+        "model_package_arn",
+        "model_monitor_enabled",
+        "drift_config",
+    )
+
     def __init__(
         self,
         stage_name: str,
@@ -27,7 +50,7 @@ class BatchConfig:
         model_package_version: str = None,
         model_package_arn: str = None,
         model_monitor_enabled: bool = False,
-        drift_config: dict = None,
+        drift_config: Union[dict, DriftConfig] = None,
     ):
         self.stage_name = stage_name
         self.instance_count = instance_count
@@ -35,7 +58,8 @@ class BatchConfig:
         self.model_package_version = model_package_version
         self.model_package_arn = model_package_arn
         self.model_monitor_enabled = model_monitor_enabled
-        if type(drift_config) is dict:
+        if isinstance(drift_config, dict):
             self.drift_config = DriftConfig(**drift_config)
         else:
-            self.drift_config = None
+            # Keep a DriftConfig passed directly, or None
+            self.drift_config = drift_config
@@ -1,5 +1,9 @@
+import json
 import logging
+import os
+import time
 from datetime import datetime
+from functools import wraps
 
 import boto3
 from botocore.config import Config
@@ -7,6 +11,76 @@ from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
 
+# Local file caching registry listings between runs, see ttl_cached
+CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.realpath(__file__))),
+    "cdk.out",
+    "registry-cache.json",
+)
+
+
+def encode_datetime(value):
+    """Encodes a datetime as a tagged json object, see decode_datetime."""
+    if isinstance(value, datetime):
+        return {"__datetime__": value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def decode_datetime(obj: dict):
+    """Decodes a json object tagged by encode_datetime back to a datetime."""
+    if "__datetime__" in obj:
+        return datetime.fromisoformat(obj["__datetime__"])
+    return obj
+
+
+def ttl_cached(method):
+    """Caches a registry listing in a local file between synth runs.
+
+    The time to live in seconds is read from MODEL_REGISTRY_CACHE_TTL, and
+    defaults to 0 which disables the cache so newly approved packages are
+    always picked up. Results are keyed by the region and account of the
+    registry client, so switching profile or region never returns another
+    account's packages. Datetime values are restored when read from the cache.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        ttl = int(os.environ.get("MODEL_REGISTRY_CACHE_TTL", "0"))
+        if ttl <= 0:
+            return method(self, *args, **kwargs)
+
+        key = json.dumps(
+            [
+                self.sm_client.meta.region_name,
+                self.get_account_id(),
+                method.__name__,
+                args,
+                kwargs,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        try:
+            with open(CACHE_FILE, "r") as f:
+                cache = json.load(f, object_hook=decode_datetime)
+        except (OSError, ValueError):
+            cache = {}
+        now = time.time()
+        if key in cache and cache[key]["expires"] > now:
+            logger.info(f"Using cached {method.__name__} result")
+            return cache[key]["value"]
+
+        # Errors are raised before anything is cached
+        value = method(self, *args, **kwargs)
+        cache = {k: v for k, v in cache.items() if v["expires"] > now}
+        cache[key] = {"expires": now + ttl, "value": value}
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(CACHE_FILE, "w") as f:
+            json.dump(cache, f, default=encode_datetime)
+        return value
+
+    return wrapper
+
 
 class ModelRegistry:
     """
@@ -14,8 +88,22 @@ class ModelRegistry:
     """
 
     def __init__(self):
-        config = Config(retries={"max_attempts": 10, "mode": "standard"})
+        config = Config(retries={"max_attempts": 10, "mode": "adaptive"})
         self.sm_client = boto3.client("sagemaker", config=config)
+        self.account_id = None
+
+    def get_account_id(self) -> str:
+        """Gets the account id of the caller, looked up once on first use.
+
+        Returns:
+            The aws account id
+        """
+        if self.account_id is None:
+            sts_client = boto3.client(
+                "sts", region_name=self.sm_client.meta.region_name
+            )
+            self.account_id = sts_client.get_caller_identity()["Account"]
+        return self.account_id
 
     def create_model_package_group(
         self,
@@ -28,19 +116,16 @@ class ModelRegistry:
         Create the model package group if it doesn't exist.
         """
         try:
+            # Tag the group as part of the project on creation
             response = self.sm_client.create_model_package_group(
                 ModelPackageGroupName=model_package_group_name,
                 ModelPackageGroupDescription=description,
-            )
-            model_package_group_arn = response["ModelPackageGroupArn"]
-            # Add tags seperately
-            self.sm_client.add_tags(
-                ResourceArn=model_package_group_arn,
                 Tags=[
                     {"Key": "sagemaker:project-name", "Value": project_name},
                     {"Key": "sagemaker:project-id", "Value": project_id},
                 ],
             )
+            model_package_group_arn = response["ModelPackageGroupArn"]
             logger.info(f"Model package group {model_package_group_arn} created")
             return True
 
@@ -59,6 +144,7 @@ class ModelRegistry:
                 logger.error(error_message)
                 raise Exception(error_message)
 
+    @ttl_cached
     def get_latest_approved_packages(
         self,
         model_package_group_name: str,
@@ -82,7 +168,8 @@ class ModelRegistry:
                 "ModelPackageGroupName": model_package_group_name,
                 "ModelApprovalStatus": "Approved",
                 "SortBy": "CreationTime",
-                "MaxResults": max_results,
+                # Page size can't exceed the API limit of 100
+                "MaxResults": min(max_results, 100),
             }
             # Add optional creationg time after
             if creation_time_after is not None:
@@ -90,7 +177,7 @@ class ModelRegistry:
             response = self.sm_client.list_model_packages(**args)
             model_packages = response["ModelPackageSummaryList"]
 
-            # Fetch more packages if none returned with continuation token
+            # Fetch more packages only while fewer than requested were returned
             while len(model_packages) < max_results and "NextToken" in response:
                 logger.debug(
                     "Getting more packages for token: {}".format(response["NextToken"])
@@ -116,6 +203,7 @@ class ModelRegistry:
             logger.error(error_message)
             raise Exception(error_message)
 
+    @ttl_cached
     def get_versioned_approved_packages(
         self,
         model_package_group_name: str,
@@ -126,42 +214,34 @@ class ModelRegistry:
         Args:
             model_package_group_name: The model package group name.
             model_package_versions: The model package versions to return.
-            creation_time_after: Optional filter that returns only model
-            packages created after the specified time (timestamp).
 
         Returns:
-            The list of model packages, sorted by most recently created
+            The list of model packages in order of versions specified.
         """
-        max_results = 100
-        unique_versions = set(model_package_versions)
-
         try:
-            # Get the approved model package until
-            args = {
-                "ModelPackageGroupName": model_package_group_name,
-                "ModelApprovalStatus": "Approved",
-                "SortBy": "CreationTime",
-                "MaxResults": max_results,
-            }
-            response = self.sm_client.list_model_packages(**args)
-            model_packages = self.select_versioned_packages(
-                response["ModelPackageSummaryList"], unique_versions
-            )
-
-            # Fetch more packages if none returned with continuation token
-            while (
-                len(model_packages) < len(unique_versions) and "NextToken" in response
-            ):
-                logger.debug(
-                    "Getting more packages for token: {}".format(response["NextToken"])
-                )
-                args = {**args, "NextToken": response["NextToken"]}
-                response = self.sm_client.list_model_packages(**args)
-                model_packages.extend(
-                    self.select_versioned_packages(
-                        response["ModelPackageSummaryList"], unique_versions
+            # Describe each unique version directly rather than paging the group
+            model_packages = []
+            for version in dict.fromkeys(model_package_versions):
+                try:
+                    model_package = self.sm_client.describe_model_package(
+                        ModelPackageName=f"{model_package_group_name}/{version}"
                     )
-                )
+                except ClientError as e:
+                    # Skip versions that don't exist, raising any other error
+                    error_code = e.response["Error"]["Code"]
+                    error_message = e.response["Error"]["Message"]
+                    if not (
+                        error_code == "ValidationException"
+                        and "does not exist" in error_message
+                    ):
+                        raise
+                    logger.warning(f"Model package version {version} not found")
+                    continue
+                if model_package.get("ModelApprovalStatus") == "Approved":
+                    model_package.pop("ResponseMetadata", None)
+                    model_packages.append(model_package)
+                else:
+                    logger.warning(f"Model package version {version} is not approved")
 
             # Return error if no packages found
             if len(model_packages) == 0:
@@ -193,11 +273,14 @@ class ModelRegistry:
             Duplicate versions will be preserved.
         """
 
+        # Index packages by version once, then look up each requested version
+        packages_by_version = {}
+        for p in model_packages:
+            packages_by_version.setdefault(p["ModelPackageVersion"], []).append(p)
+
         filtered_packages = []
         for version in model_package_versions:
-            filtered_packages += [
-                p for p in model_packages if p["ModelPackageVersion"] == version
-            ]
+            filtered_packages += packages_by_version.get(version, [])
         return filtered_packages
 
     def get_pipeline_execution_arn(self, model_package_arn: str):
@@ -249,7 +332,7 @@ class ModelRegistry:
     def get_data_check_baseline_uri(self, model_package_arn: str):
         try:
             model_details = self.sm_client.describe_model_package(ModelPackageName=model_package_arn)
-            print(model_details)
+            logger.debug(model_details)
             baseline_uri = model_details['DriftCheckBaselines']['ModelDataQuality']['Constraints']['S3Uri']
             baseline_uri = baseline_uri.replace('/constraints.json','') # returning the folder containing constraints and statistics
             return baseline_uri
@@ -7,8 +7,6 @@ from aws_cdk import (
 )
 
 import logging
-import os
-from urllib.parse import urlparse
 from batch_config import DriftConfig
 
 logger = logging.getLogger(__name__)
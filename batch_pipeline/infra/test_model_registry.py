@@ -0,0 +1,145 @@
+from datetime import datetime, timezone
+
+import pytest
+from botocore.stub import Stubber
+
+from infra import model_registry
+from infra.model_registry import ModelRegistry, decode_datetime, encode_datetime
+
+
+def get_package(version: int, creation_time: datetime = datetime.fromtimestamp(0, timezone.utc)):
+    return {
+        "ModelPackageGroupName": "test-package-group",
+        "ModelPackageVersion": version,
+        "ModelPackageArn": f"arn:aws:sagemaker:REGION:ACCOUNT:model-package/test-package-group/{version}",
+        "CreationTime": creation_time,
+        "ModelPackageStatus": "Completed",
+        "ModelApprovalStatus": "Approved",
+    }
+
+
+def get_registry(account_id: str = "111111111111"):
+    # Set the account so the cache key doesn't need an sts call
+    registry = ModelRegistry()
+    registry.account_id = account_id
+    return registry
+
+
+def add_latest_response(stubber: Stubber, version: int):
+    expected_params = {
+        "ModelPackageGroupName": "test-package-group",
+        "ModelApprovalStatus": "Approved",
+        "SortBy": "CreationTime",
+        "MaxResults": 1,
+    }
+    expected_response = {"ModelPackageSummaryList": [get_package(version)]}
+    stubber.add_response("list_model_packages", expected_response, expected_params)
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    cache_file = tmp_path / "registry-cache.json"
+    monkeypatch.setattr(model_registry, "CACHE_FILE", str(cache_file))
+    return cache_file
+
+
+def test_ttl_cache_disabled(cache_file, monkeypatch):
+    monkeypatch.setenv("MODEL_REGISTRY_CACHE_TTL", "0")
+    registry = get_registry()
+
+    with Stubber(registry.sm_client) as stubber:
+        # Each call goes to the registry and nothing is cached
+        add_latest_response(stubber, 1)
+        add_latest_response(stubber, 2)
+
+        response = registry.get_latest_approved_packages("test-package-group", max_results=1)
+        assert response == [get_package(1)]
+        response = registry.get_latest_approved_packages("test-package-group", max_results=1)
+        assert response == [get_package(2)]
+        stubber.assert_no_pending_responses()
+
+    assert not cache_file.exists()
+
+
+def test_ttl_cache_hit(cache_file, monkeypatch):
+    monkeypatch.setenv("MODEL_REGISTRY_CACHE_TTL", "300")
+    registry = get_registry()
+
+    with Stubber(registry.sm_client) as stubber:
+        # Only the first call goes to the registry
+        add_latest_response(stubber, 1)
+        response = registry.get_latest_approved_packages("test-package-group", max_results=1)
+        assert response == [get_package(1)]
+        response = registry.get_latest_approved_packages("test-package-group", max_results=1)
+        assert response == [get_package(1)]
+
+    # Expect a new registry to read from the cache file, restoring datetimes
+    registry = get_registry()
+    with Stubber(registry.sm_client):
+        response = registry.get_latest_approved_packages("test-package-group", max_results=1)
+    assert response == [get_package(1)]
+    assert isinstance(response[0]["CreationTime"], datetime)
+
+
+def test_ttl_cache_expired(cache_file, monkeypatch):
+    monkeypatch.setenv("MODEL_REGISTRY_CACHE_TTL", "300")
+    registry = get_registry()
+
+    with Stubber(registry.sm_client) as stubber:
+        add_latest_response(stubber, 1)
+        add_latest_response(stubber, 2)
+
+        now = 1000.0
+        monkeypatch.setattr(model_registry.time, "time", lambda: now)
+        response = registry.get_latest_approved_packages("test-package-group", max_results=1)
+        assert response == [get_package(1)]
+
+        # Expect the registry to be called again once the ttl has passed
+        now = 1301.0
+        response = registry.get_latest_approved_packages("test-package-group", max_results=1)
+        assert response == [get_package(2)]
+        stubber.assert_no_pending_responses()
+
+
+def test_ttl_cache_scoped_by_account(cache_file, monkeypatch):
+    monkeypatch.setenv("MODEL_REGISTRY_CACHE_TTL", "300")
+
+    registry = get_registry("111111111111")
+    with Stubber(registry.sm_client) as stubber:
+        add_latest_response(stubber, 1)
+        registry.get_latest_approved_packages("test-package-group", max_results=1)
+
+    # Expect another account to miss the cache
+    registry = get_registry("222222222222")
+    with Stubber(registry.sm_client) as stubber:
+        add_latest_response(stubber, 2)
+        response = registry.get_latest_approved_packages("test-package-group", max_results=1)
+        assert response == [get_package(2)]
+        stubber.assert_no_pending_responses()
+
+
+def test_ttl_cache_scoped_by_region(cache_file, monkeypatch):
+    monkeypatch.setenv("MODEL_REGISTRY_CACHE_TTL", "300")
+
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    registry = get_registry()
+    with Stubber(registry.sm_client) as stubber:
+        add_latest_response(stubber, 1)
+        registry.get_latest_approved_packages("test-package-group", max_results=1)
+
+    # Expect another region to miss the cache
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "eu-west-1")
+    registry = get_registry()
+    with Stubber(registry.sm_client) as stubber:
+        add_latest_response(stubber, 2)
+        response = registry.get_latest_approved_packages("test-package-group", max_results=1)
+        assert response == [get_package(2)]
+        stubber.assert_no_pending_responses()
+
+
+def test_encode_decode_datetime():
+    value = datetime(2022, 1, 1, 12, 30, tzinfo=timezone.utc)
+    assert decode_datetime(encode_datetime(value)) == value
+    assert decode_datetime({"ModelPackageVersion": 1}) == {"ModelPackageVersion": 1}
+    with pytest.raises(TypeError):
+        encode_datetime(object())
@@ -0,0 +1,89 @@
+"""Caches uploaded pipeline definitions by a digest of their inputs.
+
+Kept apart from the pipeline module so a cache hit does not import the
+sagemaker SDK.
+"""
+import glob
+import hashlib
+import json
+import os
+from importlib.metadata import version
+
+import boto3
+from botocore.exceptions import ClientError
+
+BASE_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+def s3_key_exists(s3_client, bucket, key) -> bool:
+    """Checks whether an s3 object is known to exist.
+    Args:
+        s3_client: the s3 client
+        bucket: the bucket of the object
+        key: the key of the object
+    Returns:
+        True if the object exists, False if it is missing or can't be listed
+    """
+    try:
+        s3_client.head_object(Bucket=bucket, Key=key)
+        return True
+    except ClientError as e:
+        # Without s3:ListBucket a missing key returns 403 rather than 404
+        if e.response["Error"]["Code"] in ("403", "404", "NoSuchKey"):
+            return False
+        raise
+
+
+def get_pipeline_digest(**kwargs) -> str:
+    """Gets a digest of the pipeline arguments, the scripts it is built from
+    and the sagemaker SDK version that generates its definition.
+    Args:
+        kwargs: the arguments passed to get_pipeline
+    Returns:
+        the sha256 hex digest
+    """
+    sha = hashlib.sha256(json.dumps(kwargs, sort_keys=True).encode("utf-8"))
+    # Read the installed version from package metadata, without importing the SDK
+    sha.update(version("sagemaker").encode("utf-8"))
+    for path in sorted(glob.glob(os.path.join(BASE_DIR, "*.py"))):
+        # Tests don't change the pipeline, so leave them out of the digest
+        if os.path.basename(path).startswith("test_"):
+            continue
+        with open(path, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def get_cached_pipeline(default_bucket, cache_key):
+    """Gets the pipeline definition key previously uploaded for a cache key.
+    Args:
+        default_bucket: the bucket storing the cache and pipeline definitions
+        cache_key: the s3 key of the cache manifest
+    Returns:
+        the pipeline definition key, or None if not cached or no longer in s3
+    """
+    s3_client = boto3.Session().client("s3")
+    try:
+        manifest = s3_client.get_object(Bucket=default_bucket, Key=cache_key)
+        pipeline_key = json.load(manifest["Body"])["PipelineDefinitionKey"]
+        if s3_key_exists(s3_client, default_bucket, pipeline_key):
+            return pipeline_key
+        return None
+    except (ClientError, ValueError, KeyError):
+        # A missing, unreadable or malformed manifest is a cache miss
+        return None
+
+
+def put_cached_pipeline(default_bucket, cache_key, pipeline_key):
+    """Caches the pipeline definition key under a cache key.
+    Args:
+        default_bucket: the bucket storing the cache and pipeline definitions
+        cache_key: the s3 key of the cache manifest
+        pipeline_key: the s3 key of the uploaded pipeline definition
+    """
+    boto3.Session().client("s3").put_object(
+        Bucket=default_bucket,
+        Key=cache_key,
+        Body=json.dumps({"PipelineDefinitionKey": pipeline_key}).encode("utf-8"),
+        ContentType="application/json",
+    )
@@ -7,8 +7,10 @@
 
 Implements a get_pipeline(**kwargs) method.
 """
+import hashlib
 import json
 import os
+from functools import lru_cache
 
 import boto3
 import sagemaker
@@ -50,12 +52,35 @@ from sagemaker.workflow.check_job_config import CheckJobConfig
 from sagemaker.workflow.step_collections import RegisterModel
 from sagemaker.workflow.functions import Join
 from sagemaker.workflow.execution_variables import ExecutionVariables
-from sagemaker.utils import name_from_base
+
+from pipelines.cache import s3_key_exists
 
 
 BASE_DIR = os.path.dirname(os.path.realpath(__file__))
 
 
+@lru_cache(maxsize=32)
+def get_image_uri(framework, region, version, py_version, instance_type):
+    """Gets the image uri for a framework, memoized across pipeline builds.
+    Args:
+        framework: the name of the framework
+        region: the aws region of the image
+        version: the framework version
+        py_version: the python version
+        instance_type: the instance type the image will run on
+    Returns:
+        the image uri
+    """
+
+    return sagemaker.image_uris.retrieve(
+        framework=framework,
+        region=region,
+        version=version,
+        py_version=py_version,
+        instance_type=instance_type,
+    )
+
+
 def get_session(region, default_bucket):
     """Gets the sagemaker session based on the region.
     Args:
@@ -135,12 +160,12 @@ def get_pipeline(
     cache_config = CacheConfig(enable_caching=True, expire_after="PT1H")
 
     # Create the Model step
-    image_uri_inference = sagemaker.image_uris.retrieve(
+    image_uri_inference = get_image_uri(
         framework="xgboost",
         region=region,
         version="1.2-2",
         py_version="py3",
-        instance_type=transform_instance_type,
+        instance_type=transform_instance_type.default_value,
     )
 
     model = Model(
@@ -181,12 +206,29 @@ def get_pipeline(
             ),
         ],
         outputs=[
-            ProcessingOutput(output_name="scores", source="/opt/ml/processing/output"),
+            ProcessingOutput(
+                output_name="scores",
+                source="/opt/ml/processing/output",
+                destination=Join(
+                    on="/",
+                    values=[
+                        "s3:/",
+                        default_bucket,
+                        base_job_prefix,
+                        ExecutionVariables.PIPELINE_EXECUTION_ID,
+                        "scores",
+                    ],
+                ),
+            ),
         ],
-        code=os.path.join(BASE_DIR, "score.py"),
+        code=upload_code(
+            sagemaker_session,
+            default_bucket,
+            base_job_prefix,
+            os.path.join(BASE_DIR, "score.py"),
+        ),
         cache_config=cache_config,
     )
-    step_score.add_depends_on([step_create_model])
 
     steps = [step_create_model, step_score]
 
@@ -216,7 +258,12 @@ def get_pipeline(
                     "dataqualitycheckstep",
                 ],
             ),
-            post_analytics_processor_script='pipelines/postprocess_monitor_script.py',
+            post_analytics_processor_script=upload_code(
+                sagemaker_session,
+                default_bucket,
+                base_job_prefix,
+                os.path.join(BASE_DIR, "postprocess_monitor_script.py"),
+            ),
         )
 
         step_monitor = QualityCheckStep(
@@ -225,8 +272,8 @@ def get_pipeline(
             register_new_baseline=False,
             quality_check_config=data_quality_check_config,
             check_job_config=check_job_config,
-            supplied_baseline_statistics=os.path.join(baseline_uri, "statistics.json"),
-            supplied_baseline_constraints=os.path.join(baseline_uri, "constraints.json"),
+            supplied_baseline_statistics=f"{baseline_uri}/statistics.json",
+            supplied_baseline_constraints=f"{baseline_uri}/constraints.json",
             cache_config=cache_config,
         )
 
@@ -251,12 +298,39 @@ def get_pipeline(
     return pipeline
 
 
-def upload_pipeline(pipeline: Pipeline, default_bucket, base_job_prefix) -> str:
-    # Get the pipeline definition
-    pipeline_definition_body = pipeline.definition()
-    # Upload the pipeline to a unique location in s3 based on git commit and timestamp
-    pipeline_key = f"{name_from_base(base_job_prefix)}/pipeline.json"
+def upload_code(sagemaker_session, default_bucket, base_job_prefix, path) -> str:
+    """Uploads a local script to a location in s3 keyed by its content.
+    Args:
+        sagemaker_session: the session to upload the script with
+        default_bucket: the bucket to upload the script to
+        base_job_prefix: the prefix to include after the bucket
+        path: the local path of the script
+    Returns:
+        the s3 uri of the script
+    """
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    code_uri = f"s3://{default_bucket}/{base_job_prefix}/code/{digest}"
+    code_key = f"{base_job_prefix}/code/{digest}/{os.path.basename(path)}"
+    s3_client = sagemaker_session.boto_session.client("s3")
+    if not s3_key_exists(s3_client, default_bucket, code_key):
+        S3Uploader.upload(path, code_uri, sagemaker_session=sagemaker_session)
+    return f"{code_uri}/{os.path.basename(path)}"
+
+
+def upload_pipeline(
+    pipeline: Pipeline, pipeline_definition_body: str, default_bucket, base_job_prefix
+) -> str:
+    # Upload the pipeline to a location in s3 keyed by the content of the definition
+    digest = hashlib.sha256(pipeline_definition_body.encode("utf-8")).hexdigest()
+    pipeline_key = f"{base_job_prefix}/pipeline-{digest}.json"
+    s3_client = pipeline.sagemaker_session.boto_session.client("s3")
+    if s3_key_exists(s3_client, default_bucket, pipeline_key):
+        return pipeline_key
     S3Uploader.upload_string_as_file_body(
-        pipeline_definition_body, f"s3://{default_bucket}/{pipeline_key}"
+        pipeline_definition_body,
+        f"s3://{default_bucket}/{pipeline_key}",
+        sagemaker_session=pipeline.sagemaker_session,
     )
     return pipeline_key
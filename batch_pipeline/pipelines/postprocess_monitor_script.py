@@ -4,13 +4,17 @@ import re
 import subprocess
 import sys
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 
 def install(package):
     subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
-install('boto3')
-import boto3
+try:
+    import boto3
+except ImportError:
+    # The model monitor analyzer image does not always ship boto3
+    install('boto3')
+    import boto3
 
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 logger = logging.getLogger()
@@ -20,47 +24,48 @@ pipeline_name = os.environ.get('PipelineName', 'NoPipelineNameFound')
 
 cloudwatch = boto3.client("cloudwatch", region)
 
+# Maximum number of metrics in a single PutMetricData call
+MAX_METRIC_DATA = 1000
 
-def get_baseline_drift(feature):
+# Baseline drift violation description, eg: "distance: 0.4 exceeds threshold: 0.1"
+FLOAT_PATTERN = r"([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)"
+DRIFT_PATTERN = re.compile(f"distance: {FLOAT_PATTERN} exceeds threshold: {FLOAT_PATTERN}")
+
+
+def get_baseline_drift(feature, pipeline_name: str, timestamp: datetime):
     if "violations" in feature:
         for violation in feature["violations"]:
             if violation["constraint_check_type"] == "baseline_drift_check":
                 desc = violation["description"]
-                matches = re.search("distance: (.+) exceeds threshold: (.+)", desc)
+                matches = DRIFT_PATTERN.search(desc)
                 if matches:
                     yield {
-                        "metric_name": f'feature_baseline_drift_{violation["feature_name"]}',
-                        "metric_value": float(matches.group(1)),
-                        "metric_threshold": float(matches.group(2)),
+                        "MetricName": f'feature_baseline_drift_{violation["feature_name"]}',
+                        "Dimensions": [{"Name": "PipelineName", "Value": pipeline_name}],
+                        "Timestamp": timestamp,
+                        "Value": float(matches.group(1)),
+                        "Unit": "None",
                     }
 
                     
-def put_cloudwatch_metric(pipeline_name: str, metrics: list):
-    for m in metrics:
-        logger.info(f'Putting metric: {m["metric_name"]} value: {m["metric_value"]}')
-        response = cloudwatch.put_metric_data(
+def put_cloudwatch_metric(pipeline_name: str, metric_data: list):
+    # Send all metrics in as few calls as the API allows
+    logger.info("Putting %d metrics for pipeline: %s", len(metric_data), pipeline_name)
+    for i in range(0, len(metric_data), MAX_METRIC_DATA):
+        cloudwatch.put_metric_data(
             Namespace="aws/sagemaker/ModelBuildingPipeline/data-metrics",
-            MetricData=[
-                {
-                    "MetricName": m["metric_name"],
-                    "Dimensions": [{"Name": "PipelineName", "Value": pipeline_name}],
-                    "Timestamp": datetime.now(),
-                    "Value": m["metric_value"],
-                    "Unit": "None",
-                },
-            ],
+            MetricData=metric_data[i : i + MAX_METRIC_DATA],
         )
-        logger.debug(response)
 
         
 def postprocess_handler():
     violations_file = "/opt/ml/processing/output/constraint_violations.json"
     if os.path.isfile(violations_file):
-        f = open(violations_file)
-        violations = json.load(f)
-        metrics = list(get_baseline_drift(violations))
+        with open(violations_file) as f:
+            violations = json.load(f)
+        metric_data = list(get_baseline_drift(violations, pipeline_name, datetime.now(timezone.utc)))
         
-        put_cloudwatch_metric(pipeline_name, metrics)
+        put_cloudwatch_metric(pipeline_name, metric_data)
         logger.info("Violation detected and added to cloudwatch")
     else: 
         logger.info("No constraint_violations file found. All good!")
@@ -1,35 +1,43 @@
 """Evaluation script for measuring mean squared error."""
 import logging
+import os
 import pathlib
 import glob
 import pickle
 import tarfile
+from concurrent.futures import ThreadPoolExecutor
 from math import sqrt
 
 import pandas as pd
-import xgboost
 
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 logger.addHandler(logging.StreamHandler())
 
 
+def get_model_member(tar: tarfile.TarFile, name: str = "xgboost-model"):
+    # Archives may prefix members with "./", so match on the normalized basename
+    member = next(
+        (m for m in tar.getmembers() if os.path.basename(os.path.normpath(m.name)) == name),
+        None,
+    )
+    if member is None:
+        raise FileNotFoundError(f"Model file {name} not found in archive")
+    return member
+
+
 def load_data(file_list: list):
-    # Load input files with header
-    dfs = []
-    for file in file_list:
-        dfs.append(pd.read_csv(file))
-    return pd.concat(dfs, ignore_index=True)
+    # Load input files with header, parsing them concurrently
+    with ThreadPoolExecutor(max_workers=max(1, min(32, len(file_list)))) as executor:
+        return pd.concat(executor.map(pd.read_csv, file_list), ignore_index=True)
 
 
 if __name__ == "__main__":
     logger.debug("Starting evaluation.")
     model_path = "/opt/ml/processing/model/model.tar.gz"
-    with tarfile.open(model_path) as tar:
-        tar.extractall(path=".")
-
     logger.debug("Loading xgboost model.")
-    model = pickle.load(open("xgboost-model", "rb"))
+    with tarfile.open(model_path) as tar:
+        model = pickle.load(tar.extractfile(get_model_member(tar)))
 
     logger.debug("Reading input data.")
 
@@ -39,10 +47,10 @@ if __name__ == "__main__":
     # Drop the first target column
     df = load_data(input_file_list)
     target_col = "fare_amount"
-    X_test = xgboost.DMatrix(df.drop(target_col, axis=1).values)
+    X_test = df.drop(target_col, axis=1).to_numpy(dtype="float32")
 
     logger.info("Performing predictions against test data.")
-    predictions = model.predict(X_test)
+    predictions = model.inplace_predict(X_test)
 
     # Replace the target column with predictions, to allow comparing in model monitor
     df[target_col] = predictions
@@ -0,0 +1,153 @@
+import io
+import json
+from types import SimpleNamespace
+
+import boto3
+import pytest
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+
+from pipelines import cache
+from pipelines.cache import (
+    get_cached_pipeline,
+    get_pipeline_digest,
+    put_cached_pipeline,
+    s3_key_exists,
+)
+
+
+def get_s3_client():
+    return boto3.client("s3", region_name="us-east-1")
+
+
+@pytest.fixture
+def s3_client(monkeypatch):
+    # Return the stubbed client from the sessions created by the cache
+    s3_client = get_s3_client()
+    monkeypatch.setattr(
+        cache.boto3, "Session", lambda: SimpleNamespace(client=lambda name: s3_client)
+    )
+    return s3_client
+
+
+@pytest.fixture
+def sagemaker_version(monkeypatch):
+    versions = {"sagemaker": "2.70.0"}
+    monkeypatch.setattr(cache, "version", lambda name: versions[name])
+    return versions
+
+
+def add_manifest_response(stubber: Stubber, body: bytes):
+    expected_params = {"Bucket": "test-bucket", "Key": "test-cache-key"}
+    expected_response = {"Body": StreamingBody(io.BytesIO(body), len(body))}
+    stubber.add_response("get_object", expected_response, expected_params)
+
+
+def add_head_error(stubber: Stubber, key: str, status_code: int):
+    # HeadObject has no body, so the error code is the http status
+    stubber.add_client_error(
+        "head_object",
+        str(status_code),
+        http_status_code=status_code,
+        expected_params={"Bucket": "test-bucket", "Key": key},
+    )
+
+
+def test_s3_key_exists():
+    s3_client = get_s3_client()
+
+    with Stubber(s3_client) as stubber:
+        expected_params = {"Bucket": "test-bucket", "Key": "test-key"}
+        stubber.add_response("head_object", {}, expected_params)
+
+        assert s3_key_exists(s3_client, "test-bucket", "test-key")
+
+
+@pytest.mark.parametrize("status_code", [403, 404])
+def test_s3_key_missing(status_code):
+    s3_client = get_s3_client()
+
+    with Stubber(s3_client) as stubber:
+        # Expect 403 as missing too, as returned without s3:ListBucket
+        add_head_error(stubber, "test-key", status_code)
+
+        assert not s3_key_exists(s3_client, "test-bucket", "test-key")
+
+
+def test_s3_key_exists_raises_server_error():
+    s3_client = get_s3_client()
+
+    with Stubber(s3_client) as stubber:
+        add_head_error(stubber, "test-key", 500)
+
+        with pytest.raises(ClientError):
+            s3_key_exists(s3_client, "test-bucket", "test-key")
+
+
+def test_pipeline_digest_stable(sagemaker_version):
+    digest = get_pipeline_digest(region="us-east-1", baseline_uri=None)
+    assert digest == get_pipeline_digest(baseline_uri=None, region="us-east-1")
+
+
+def test_pipeline_digest_changes(sagemaker_version):
+    digest = get_pipeline_digest(region="us-east-1", baseline_uri=None)
+    assert digest != get_pipeline_digest(region="us-east-1", baseline_uri="s3://b")
+
+    # Expect a different sagemaker SDK to change the digest
+    sagemaker_version["sagemaker"] = "2.71.0"
+    assert digest != get_pipeline_digest(region="us-east-1", baseline_uri=None)
+
+
+def test_cached_pipeline_hit(s3_client):
+    with Stubber(s3_client) as stubber:
+        body = json.dumps({"PipelineDefinitionKey": "test-pipeline-key"}).encode("utf-8")
+        add_manifest_response(stubber, body)
+        expected_params = {"Bucket": "test-bucket", "Key": "test-pipeline-key"}
+        stubber.add_response("head_object", {}, expected_params)
+
+        assert get_cached_pipeline("test-bucket", "test-cache-key") == "test-pipeline-key"
+        stubber.assert_no_pending_responses()
+
+
+def test_cached_pipeline_missing_manifest(s3_client):
+    with Stubber(s3_client) as stubber:
+        stubber.add_client_error(
+            "get_object",
+            "NoSuchKey",
+            http_status_code=404,
+            expected_params={"Bucket": "test-bucket", "Key": "test-cache-key"},
+        )
+
+        assert get_cached_pipeline("test-bucket", "test-cache-key") is None
+
+
+@pytest.mark.parametrize("body", [b'{"PipelineDefinitionKey": ', b'{"Key": "test-pipeline-key"}'])
+def test_cached_pipeline_malformed_manifest(s3_client, body):
+    with Stubber(s3_client) as stubber:
+        add_manifest_response(stubber, body)
+
+        assert get_cached_pipeline("test-bucket", "test-cache-key") is None
+
+
+def test_cached_pipeline_missing_definition(s3_client):
+    with Stubber(s3_client) as stubber:
+        body = json.dumps({"PipelineDefinitionKey": "test-pipeline-key"}).encode("utf-8")
+        add_manifest_response(stubber, body)
+        add_head_error(stubber, "test-pipeline-key", 404)
+
+        assert get_cached_pipeline("test-bucket", "test-cache-key") is None
+
+
+def test_put_cached_pipeline(s3_client):
+    with Stubber(s3_client) as stubber:
+        expected_params = {
+            "Bucket": "test-bucket",
+            "Key": "test-cache-key",
+            "Body": json.dumps({"PipelineDefinitionKey": "test-pipeline-key"}).encode("utf-8"),
+            "ContentType": "application/json",
+        }
+        stubber.add_response("put_object", {}, expected_params)
+
+        put_cached_pipeline("test-bucket", "test-cache-key", "test-pipeline-key")
+        stubber.assert_no_pending_responses()
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+import pytest
+from botocore.stub import Stubber
+
+from pipelines import postprocess_monitor_script
+from pipelines.postprocess_monitor_script import get_baseline_drift, put_cloudwatch_metric
+
+TIMESTAMP = datetime(2022, 1, 1, tzinfo=timezone.utc)
+
+
+def get_violation(feature_name: str, description: str, check_type: str = "baseline_drift_check"):
+    return {
+        "feature_name": feature_name,
+        "constraint_check_type": check_type,
+        "description": description,
+    }
+
+
+def test_get_baseline_drift():
+    violations = {
+        "violations": [
+            get_violation("trip_distance", "distance: 0.4 exceeds threshold: 0.1."),
+            get_violation("fare_amount", "distance: 1.5e-2 exceeds threshold: 1e-3"),
+        ]
+    }
+
+    metric_data = list(get_baseline_drift(violations, "test-pipeline", TIMESTAMP))
+    assert metric_data == [
+        {
+            "MetricName": "feature_baseline_drift_trip_distance",
+            "Dimensions": [{"Name": "PipelineName", "Value": "test-pipeline"}],
+            "Timestamp": TIMESTAMP,
+            "Value": 0.4,
+            "Unit": "None",
+        },
+        {
+            "MetricName": "feature_baseline_drift_fare_amount",
+            "Dimensions": [{"Name": "PipelineName", "Value": "test-pipeline"}],
+            "Timestamp": TIMESTAMP,
+            "Value": 0.015,
+            "Unit": "None",
+        },
+    ]
+
+
+def test_get_baseline_drift_skips_other_violations():
+    violations = {
+        "violations": [
+            # Expect other check types and unmatched descriptions to be skipped
+            get_violation("passenger_count", "Data type mismatch", "data_type_check"),
+            get_violation("trip_distance", "Baseline drift distance is unavailable"),
+        ]
+    }
+
+    assert list(get_baseline_drift(violations, "test-pipeline", TIMESTAMP)) == []
+    assert list(get_baseline_drift({}, "test-pipeline", TIMESTAMP)) == []
+
+
+def get_metric_data(count: int):
+    return [
+        {
+            "MetricName": f"feature_baseline_drift_feature_{i}",
+            "Dimensions": [{"Name": "PipelineName", "Value": "test-pipeline"}],
+            "Timestamp": TIMESTAMP,
+            "Value": 0.4,
+            "Unit": "None",
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.parametrize("count, calls", [(0, 0), (1, 1), (1000, 1), (1001, 2)])
+def test_put_cloudwatch_metric(count, calls):
+    metric_data = get_metric_data(count)
+
+    with Stubber(postprocess_monitor_script.cloudwatch) as stubber:
+        # Expect at most 1000 metrics in each call
+        for i in range(calls):
+            expected_params = {
+                "Namespace": "aws/sagemaker/ModelBuildingPipeline/data-metrics",
+                "MetricData": metric_data[i * 1000 : (i + 1) * 1000],
+            }
+            stubber.add_response("put_metric_data", {}, expected_params)
+
+        put_cloudwatch_metric("test-pipeline", metric_data)
+        stubber.assert_no_pending_responses()
@@ -0,0 +1,227 @@
+from datetime import datetime
+
+import pytest
+from botocore.stub import Stubber
+
+from app import get_model_artifacts, select_model_packages
+from infra.batch_config import BatchConfig
+from infra.model_registry import ModelRegistry
+
+
+def get_arn(version: int):
+    return f"arn:aws:sagemaker:REGION:ACCOUNT:model-package/test-package-group/{version}"
+
+
+def get_described_package(version: int):
+    return {
+        "ModelPackageName": "STUB",
+        "ModelPackageGroupName": "test-package-group",
+        "ModelPackageVersion": version,
+        "ModelPackageArn": get_arn(version),
+        "CreationTime": datetime.fromtimestamp(0),
+        "ModelPackageStatus": "Completed",
+        "ModelApprovalStatus": "Approved",
+        "ModelPackageStatusDetails": {"ValidationStatuses": []},
+    }
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    # Always call the registry rather than the local cache
+    monkeypatch.delenv("MODEL_REGISTRY_CACHE_TTL", raising=False)
+    return ModelRegistry()
+
+
+def add_latest_response(stubber: Stubber, version: int):
+    expected_params = {
+        "ModelPackageGroupName": "test-package-group",
+        "ModelApprovalStatus": "Approved",
+        "SortBy": "CreationTime",
+        "MaxResults": 1,
+    }
+    expected_response = {
+        "ModelPackageSummaryList": [
+            {
+                "ModelPackageGroupName": "test-package-group",
+                "ModelPackageVersion": version,
+                "ModelPackageArn": get_arn(version),
+                "CreationTime": datetime.fromtimestamp(0),
+                "ModelPackageStatus": "Completed",
+                "ModelApprovalStatus": "Approved",
+            }
+        ]
+    }
+    stubber.add_response("list_model_packages", expected_response, expected_params)
+
+
+def add_describe_response(stubber: Stubber, version: int):
+    expected_params = {"ModelPackageName": f"test-package-group/{version}"}
+    stubber.add_response(
+        "describe_model_package", get_described_package(version), expected_params
+    )
+
+
+def test_select_latest_model_packages(registry):
+    batch_configs = [BatchConfig("staging"), BatchConfig("prod")]
+
+    with Stubber(registry.sm_client) as stubber:
+        # Expect a single lookup shared by both stages
+        add_latest_response(stubber, 3)
+
+        select_model_packages(registry, "test-package-group", batch_configs)
+        stubber.assert_no_pending_responses()
+
+    for batch_config in batch_configs:
+        assert batch_config.model_package_version == 3
+        assert batch_config.model_package_arn == get_arn(3)
+
+
+def test_select_versioned_model_packages(registry):
+    batch_configs = [
+        BatchConfig("staging", model_package_version=2),
+        BatchConfig("prod", model_package_version=1),
+    ]
+
+    with Stubber(registry.sm_client) as stubber:
+        add_describe_response(stubber, 2)
+        add_describe_response(stubber, 1)
+
+        select_model_packages(registry, "test-package-group", batch_configs)
+        stubber.assert_no_pending_responses()
+
+    assert batch_configs[0].model_package_arn == get_arn(2)
+    assert batch_configs[1].model_package_arn == get_arn(1)
+
+
+def test_select_mixed_model_packages(registry):
+    batch_configs = [
+        BatchConfig("staging"),
+        BatchConfig("prod", model_package_version=1),
+    ]
+
+    with Stubber(registry.sm_client) as stubber:
+        add_latest_response(stubber, 3)
+        add_describe_response(stubber, 1)
+
+        select_model_packages(registry, "test-package-group", batch_configs)
+        stubber.assert_no_pending_responses()
+
+    assert batch_configs[0].model_package_version == 3
+    assert batch_configs[0].model_package_arn == get_arn(3)
+    assert batch_configs[1].model_package_version == 1
+    assert batch_configs[1].model_package_arn == get_arn(1)
+
+
+def test_select_missing_versioned_model_package(registry):
+    batch_configs = [
+        BatchConfig("staging", model_package_version=2),
+        BatchConfig("prod", model_package_version=9),
+    ]
+
+    with Stubber(registry.sm_client) as stubber:
+        add_describe_response(stubber, 2)
+        # Version 9 does not exist
+        stubber.add_client_error(
+            "describe_model_package",
+            "ValidationException",
+            "ModelPackage does not exist",
+            expected_params={"ModelPackageName": "test-package-group/9"},
+        )
+
+        # Expect an error for the stage pinned to the missing version
+        with pytest.raises(Exception, match="version: 9"):
+            select_model_packages(registry, "test-package-group", batch_configs)
+
+
+def add_model_artifact_responses(stubber: Stubber, version: int):
+    # Model package lineage to the pipeline execution that trained it
+    expected_params = {"SourceUri": get_arn(version)}
+    expected_response = {"ArtifactSummaries": [{"ArtifactArn": f"artifact-{version}"}]}
+    stubber.add_response("list_artifacts", expected_response, expected_params)
+    expected_params = {"ArtifactArn": f"artifact-{version}"}
+    expected_response = {"MetadataProperties": {"GeneratedBy": f"execution-{version}"}}
+    stubber.add_response("describe_artifact", expected_response, expected_params)
+
+    # Pipeline execution training step to the model artifact
+    expected_params = {"PipelineExecutionArn": f"execution-{version}"}
+    expected_response = {
+        "PipelineExecutionSteps": [
+            {
+                "StepName": "TrainModel",
+                "Metadata": {"TrainingJob": {"Arn": f"arn:aws:sagemaker:REGION:ACCOUNT:training-job/job-{version}"}},
+            }
+        ]
+    }
+    stubber.add_response("list_pipeline_execution_steps", expected_response, expected_params)
+    expected_params = {"TrainingJobName": f"job-{version}"}
+    expected_response = {
+        "TrainingJobName": f"job-{version}",
+        "TrainingJobArn": f"arn:aws:sagemaker:REGION:ACCOUNT:training-job/job-{version}",
+        "ModelArtifacts": {"S3ModelArtifacts": f"s3://test-bucket/model-{version}.tar.gz"},
+        "TrainingJobStatus": "Completed",
+        "SecondaryStatus": "Completed",
+        "AlgorithmSpecification": {"TrainingInputMode": "File"},
+        "ResourceConfig": {"VolumeSizeInGB": 30},
+        "StoppingCondition": {},
+        "CreationTime": datetime.fromtimestamp(0),
+    }
+    stubber.add_response("describe_training_job", expected_response, expected_params)
+
+
+def add_baseline_response(stubber: Stubber, version: int):
+    expected_params = {"ModelPackageName": get_arn(version)}
+    expected_response = {
+        **get_described_package(version),
+        "DriftCheckBaselines": {
+            "ModelDataQuality": {
+                "Constraints": {
+                    "ContentType": "application/json",
+                    "S3Uri": f"s3://test-bucket/baseline-{version}/constraints.json",
+                }
+            }
+        },
+    }
+    stubber.add_response("describe_model_package", expected_response, expected_params)
+
+
+def test_get_model_artifacts_shared_arn(registry):
+    drift_config = {"metric_name": "test-metric", "metric_threshold": 0.4}
+    batch_configs = [
+        BatchConfig("staging", model_package_arn=get_arn(3)),
+        BatchConfig("prod", model_package_arn=get_arn(3), drift_config=drift_config),
+    ]
+
+    with Stubber(registry.sm_client) as stubber:
+        # Expect one set of lookups for the arn shared by both stages
+        add_model_artifact_responses(stubber, 3)
+        add_baseline_response(stubber, 3)
+
+        model_artifacts = get_model_artifacts(registry, batch_configs)
+        stubber.assert_no_pending_responses()
+
+    assert model_artifacts == {
+        get_arn(3): {
+            "model_uri": "s3://test-bucket/model-3.tar.gz",
+            "baseline_uri": "s3://test-bucket/baseline-3",
+        }
+    }
+
+
+def test_get_model_artifacts_per_arn(registry):
+    batch_configs = [
+        BatchConfig("staging", model_package_arn=get_arn(3)),
+        BatchConfig("prod", model_package_arn=get_arn(2)),
+    ]
+
+    with Stubber(registry.sm_client) as stubber:
+        # No baseline lookups without drift config
+        add_model_artifact_responses(stubber, 3)
+        add_model_artifact_responses(stubber, 2)
+
+        model_artifacts = get_model_artifacts(registry, batch_configs)
+        stubber.assert_no_pending_responses()
+
+    assert model_artifacts == {
+        get_arn(3): {"model_uri": "s3://test-bucket/model-3.tar.gz", "baseline_uri": None},
+        get_arn(2): {"model_uri": "s3://test-bucket/model-2.tar.gz", "baseline_uri": None},
+    }
@@ -2,15 +2,14 @@
 import argparse
 import logging
 import os
+import sys
 
 import aws_cdk as cdk
 
 from infra.sagemaker_pipeline_stack import SageMakerPipelineStack
 from pipelines.pipeline import get_pipeline
 
-# Configure the logger
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
 
 
 def main(
@@ -67,30 +66,28 @@ def main(
     app.synth()
 
 
+# Map each argument to the environment variable providing its default
+ENV_ARGS = {
+    "region": "AWS_REGION",
+    "project_name": "SAGEMAKER_PROJECT_NAME",
+    "project_id": "SAGEMAKER_PROJECT_ID",
+    "sagemaker_pipeline_name": "SAGEMAKER_PIPELINE_NAME",
+    "sagemaker_pipeline_description": "SAGEMAKER_PIPELINE_DESCRIPTION",
+    "sagemaker_pipeline_role": "SAGEMAKER_PIPELINE_ROLE_ARN",
+    "artifact_bucket": "ARTIFACT_BUCKET",
+}
+
+
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Load parameters")
-    parser.add_argument("--region", default=os.environ.get("AWS_REGION"))
-    parser.add_argument(
-        "--project-name",
-        default=os.environ.get("SAGEMAKER_PROJECT_NAME"),
-    )
-    parser.add_argument("--project-id", default=os.environ.get("SAGEMAKER_PROJECT_ID"))
-    parser.add_argument(
-        "--sagemaker-pipeline-name",
-        default=os.environ.get("SAGEMAKER_PIPELINE_NAME"),
-    )
-    parser.add_argument(
-        "--sagemaker-pipeline-description",
-        default=os.environ.get("SAGEMAKER_PIPELINE_DESCRIPTION"),
-    )
-    parser.add_argument(
-        "--sagemaker-pipeline-role",
-        default=os.environ.get("SAGEMAKER_PIPELINE_ROLE_ARN"),
-    )
-    parser.add_argument(
-        "--artifact-bucket",
-        default=os.environ.get("ARTIFACT_BUCKET"),
-    )
-    args = vars(parser.parse_args())
+    # Configure the logger when run as a script, leaving importers' logging untouched
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"))
+
+    # Read arguments from the environment, only parsing the command line if given
+    args = {name: os.environ.get(env) for name, env in ENV_ARGS.items()}
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description="Load parameters")
+        for name in ENV_ARGS:
+            parser.add_argument(f"--{name.replace('_', '-')}", default=args[name])
+        args = vars(parser.parse_args())
     logger.info("args: {}".format(args))
     main(**args)
@@ -3,6 +3,7 @@ import argparse
 import json
 import logging
 import os
+import sys
 
 import aws_cdk as cdk
 
@@ -10,9 +11,7 @@ from infra.deployment_config import DeploymentConfig, VariantConfig
 from infra.model_registry import ModelRegistry
 from infra.sagemaker_stack import SageMakerStack
 
-# Configure the logger
 logger = logging.getLogger(__name__)
-logging.basicConfig(level="INFO")
 
 registry = ModelRegistry()
 
@@ -24,6 +23,7 @@ def create_endpoint(
     sagemaker_execution_role: str,
     artifact_bucket: str,
     stage_name: str,
+    synthesizer_props: dict,
 ):
 
     # Define variables for passing down to stacks
@@ -73,17 +73,15 @@ def create_endpoint(
     baseline_uri = registry.get_data_check_baseline_uri(p["ModelPackageArn"])
     logger.info(f"Got baseline uri: {baseline_uri}")
 
-    data_capture_uri = f"s3://{artifact_bucket}/{project_id}/datacapture"
+    project_uri = f"s3://{artifact_bucket}/{project_id}"
+    data_capture_uri = f"{project_uri}/datacapture"
     logger.info(f"Got data capture uri: {data_capture_uri}")
 
-    reporting_uri = f"s3://{artifact_bucket}/{project_id}/monitoring"
+    reporting_uri = f"{project_uri}/monitoring"
     logger.info(f"Got reporting uri: {reporting_uri}")
 
-    stack_synthesizer = cdk.DefaultStackSynthesizer(
-        file_assets_bucket_name=artifact_bucket,
-        bucket_prefix="deploy-pipeline-cdk-assets/",
-        generate_bootstrap_version_rule=False,
-    )
+    # Synthesizers can't be shared across stacks before aws-cdk-lib 2.56
+    stack_synthesizer = cdk.DefaultStackSynthesizer(**synthesizer_props)
 
     return SageMakerStack(
         app,
@@ -109,6 +107,13 @@ def main(
     # Create App and stacks
     app = cdk.App()
 
+    # Define the asset synthesizer properties once for all stages
+    synthesizer_props = dict(
+        file_assets_bucket_name=artifact_bucket,
+        bucket_prefix="deploy-pipeline-cdk-assets/",
+        generate_bootstrap_version_rule=False,
+    )
+
     # Create two different stages for staging and prod
     create_endpoint(
         app,
@@ -117,6 +122,7 @@ def main(
         sagemaker_execution_role=sagemaker_execution_role,
         artifact_bucket=artifact_bucket,
         stage_name="staging",
+        synthesizer_props=synthesizer_props,
     )
     create_endpoint(
         app,
@@ -125,26 +131,31 @@ def main(
         sagemaker_execution_role=sagemaker_execution_role,
         artifact_bucket=artifact_bucket,
         stage_name="prod",
+        synthesizer_props=synthesizer_props,
     )
 
     app.synth()
 
 
+# Map each argument to the environment variable providing its default
+ENV_ARGS = {
+    "project_name": "SAGEMAKER_PROJECT_NAME",
+    "project_id": "SAGEMAKER_PROJECT_ID",
+    "sagemaker_execution_role": "SAGEMAKER_EXECUTION_ROLE_ARN",
+    "artifact_bucket": "ARTIFACT_BUCKET",
+}
+
+
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Load parameters")
-    parser.add_argument(
-        "--project-name",
-        default=os.environ.get("SAGEMAKER_PROJECT_NAME"),
-    )
-    parser.add_argument("--project-id", default=os.environ.get("SAGEMAKER_PROJECT_ID"))
-    parser.add_argument(
-        "--sagemaker-execution-role",
-        default=os.environ.get("SAGEMAKER_EXECUTION_ROLE_ARN"),
-    )
-    parser.add_argument(
-        "--artifact-bucket",
-        default=os.environ.get("ARTIFACT_BUCKET"),
-    )
-    args = vars(parser.parse_args())
+    # Configure the logger when run as a script, leaving importers' logging untouched
+    logging.basicConfig(level="INFO")
+
+    # Read arguments from the environment, only parsing the command line if given
+    args = {name: os.environ.get(env) for name, env in ENV_ARGS.items()}
+    if len(sys.argv) > 1:
+        parser = argparse.ArgumentParser(description="Load parameters")
+        for name in ENV_ARGS:
+            parser.add_argument(f"--{name.replace('_', '-')}", default=args[name])
+        args = vars(parser.parse_args())
     print("args: {}".format(args))
     main(**args)
@@ -14,7 +14,7 @@ class ModelRegistry:
     """
 
     def __init__(self):
-        config = Config(retries={"max_attempts": 10, "mode": "standard"})
+        config = Config(retries={"max_attempts": 10, "mode": "adaptive"})
         self.sm_client = boto3.client("sagemaker", config=config)
 
     def create_model_package_group(
@@ -28,19 +28,16 @@ class ModelRegistry:
         Create the model package group if it doesn't exist.
         """
         try:
+            # Tag the group as part of the project on creation
             response = self.sm_client.create_model_package_group(
                 ModelPackageGroupName=model_package_group_name,
                 ModelPackageGroupDescription=description,
-            )
-            model_package_group_arn = response["ModelPackageGroupArn"]
-            # Add tags separately
-            self.sm_client.add_tags(
-                ResourceArn=model_package_group_arn,
                 Tags=[
                     {"Key": "sagemaker:project-name", "Value": project_name},
                     {"Key": "sagemaker:project-id", "Value": project_id},
                 ],
             )
+            model_package_group_arn = response["ModelPackageGroupArn"]
             logger.info(f"Model package group {model_package_group_arn} created")
             return True
 
@@ -82,7 +79,8 @@ class ModelRegistry:
                 "ModelPackageGroupName": model_package_group_name,
                 "ModelApprovalStatus": "Approved",
                 "SortBy": "CreationTime",
-                "MaxResults": max_results,
+                # Page size can't exceed the API limit of 100
+                "MaxResults": min(max_results, 100),
             }
             # Add optional creation time after
             if creation_time_after is not None:
@@ -90,7 +88,7 @@ class ModelRegistry:
             response = self.sm_client.list_model_packages(**args)
             model_packages = response["ModelPackageSummaryList"]
 
-            # Fetch more packages if none returned with continuation token
+            # Fetch more packages only while fewer than requested were returned
             while len(model_packages) < max_results and "NextToken" in response:
                 logger.debug(
                     "Getting more packages for token: {}".format(response["NextToken"])
@@ -126,42 +124,34 @@ class ModelRegistry:
         Args:
             model_package_group_name: The model package group name.
             model_package_versions: The model package versions to return.
-            creation_time_after: Optional filter that returns only model
-            packages created after the specified time (timestamp).
 
         Returns:
-            The list of model packages, sorted by most recently created
+            The list of model packages in order of versions specified.
         """
-        max_results = 100
-        unique_versions = set(model_package_versions)
-
         try:
-            # Get the approved model package until
-            args = {
-                "ModelPackageGroupName": model_package_group_name,
-                "ModelApprovalStatus": "Approved",
-                "SortBy": "CreationTime",
-                "MaxResults": max_results,
-            }
-            response = self.sm_client.list_model_packages(**args)
-            model_packages = self.select_versioned_packages(
-                response["ModelPackageSummaryList"], unique_versions
-            )
-
-            # Fetch more packages if none returned with continuation token
-            while (
-                len(model_packages) < len(unique_versions) and "NextToken" in response
-            ):
-                logger.debug(
-                    "Getting more packages for token: {}".format(response["NextToken"])
-                )
-                args = {**args, "NextToken": response["NextToken"]}
-                response = self.sm_client.list_model_packages(**args)
-                model_packages.extend(
-                    self.select_versioned_packages(
-                        response["ModelPackageSummaryList"], unique_versions
+            # Describe each unique version directly rather than paging the group
+            model_packages = []
+            for version in dict.fromkeys(model_package_versions):
+                try:
+                    model_package = self.sm_client.describe_model_package(
+                        ModelPackageName=f"{model_package_group_name}/{version}"
                     )
-                )
+                except ClientError as e:
+                    # Skip versions that don't exist, raising any other error
+                    error_code = e.response["Error"]["Code"]
+                    error_message = e.response["Error"]["Message"]
+                    if not (
+                        error_code == "ValidationException"
+                        and "does not exist" in error_message
+                    ):
+                        raise
+                    logger.warning(f"Model package version {version} not found")
+                    continue
+                if model_package.get("ModelApprovalStatus") == "Approved":
+                    model_package.pop("ResponseMetadata", None)
+                    model_packages.append(model_package)
+                else:
+                    logger.warning(f"Model package version {version} is not approved")
 
             # Return error if no packages found
             if len(model_packages) == 0:
@@ -193,11 +183,14 @@ class ModelRegistry:
             Duplicate versions will be preserved.
         """
 
+        # Index packages by version once, then look up each requested version
+        packages_by_version = {}
+        for p in model_packages:
+            packages_by_version.setdefault(p["ModelPackageVersion"], []).append(p)
+
         filtered_packages = []
         for version in model_package_versions:
-            filtered_packages += [
-                p for p in model_packages if p["ModelPackageVersion"] == version
-            ]
+            filtered_packages += packages_by_version.get(version, [])
         return filtered_packages
 
     def get_pipeline_execution_arn(self, model_package_arn: str):
@@ -221,7 +214,7 @@ class ModelRegistry:
     def get_data_check_baseline_uri(self, model_package_arn: str):
         try:
             model_details = self.sm_client.describe_model_package(ModelPackageName=model_package_arn)
-            print(model_details)
+            logger.debug(model_details)
             baseline_uri = model_details['DriftCheckBaselines']['ModelDataQuality']['Constraints']['S3Uri']
             baseline_uri = baseline_uri.replace('/constraints.json','') # returning the folder containing constraints and statistics
             return baseline_uri
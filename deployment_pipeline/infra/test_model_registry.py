@@ -18,15 +18,26 @@ def get_package(version: int, creation_time: datetime = datetime.fromtimestamp(0
     }
 
 
+def get_described_package(version: int):
+    return {
+        **get_package(version),
+        "ModelPackageStatusDetails": {"ValidationStatuses": []},
+    }
+
+
 def test_create_model_package_group():
     # Create model registry
     registry = ModelRegistry()
 
     with Stubber(registry.sm_client) as stubber:
-        # Add test package
+        # Add test package with project tags
         expected_params = {
             "ModelPackageGroupDescription": "test package group",
             "ModelPackageGroupName": "test-package-group",
+            "Tags": [
+                {"Key": "sagemaker:project-name", "Value": "test-project-name"},
+                {"Key": "sagemaker:project-id", "Value": "test-project-id"},
+            ],
         }
         expected_response = {
             "ModelPackageGroupArn": "arn:aws:sagemaker:REGION:ACCOUNT:model-package-group/test-package-group",
@@ -35,27 +46,15 @@ def test_create_model_package_group():
             "create_model_package_group", expected_response, expected_params
         )
 
-        # Add project tags
+        # Second time, add the client error if this exists
         expected_params = {
-            "ResourceArn": "arn:aws:sagemaker:REGION:ACCOUNT:model-package-group/test-package-group",
+            "ModelPackageGroupDescription": "test package group",
+            "ModelPackageGroupName": "test-package-group",
             "Tags": [
                 {"Key": "sagemaker:project-name", "Value": "test-project-name"},
                 {"Key": "sagemaker:project-id", "Value": "test-project-id"},
             ],
         }
-        expected_response = {
-            "Tags": [
-                {"Key": "sagemaker:project-name", "Value": "test-project-name"},
-                {"Key": "sagemaker:project-id", "Value": "test-project-id"},
-            ]
-        }
-        stubber.add_response("add_tags", expected_response)
-
-        # Second time, add the client error if this exists
-        expected_params = {
-            "ModelPackageGroupDescription": "test package group",
-            "ModelPackageGroupName": "test-package-group",
-        }
         stubber.add_client_error(
             "create_model_package_group",
             "ValidationException",
@@ -259,60 +258,111 @@ def test_get_versioned_approved_model_packages():
     registry = ModelRegistry()
 
     with Stubber(registry.sm_client) as stubber:
-        # Empty list with more
-        expected_params = {
-            "ModelPackageGroupName": "test-package-group",
-            "ModelApprovalStatus": "Approved",
-            "SortBy": "CreationTime",
-            "MaxResults": 100,
-        }
-        expected_response = {
-            "ModelPackageSummaryList": [],
-            "NextToken": "MORE1",
-        }
-        stubber.add_response("list_model_packages", expected_response, expected_params)
-        # Version 1 with more
-        expected_params = {
-            "ModelPackageGroupName": "test-package-group",
-            "ModelApprovalStatus": "Approved",
-            "SortBy": "CreationTime",
-            "MaxResults": 100,
-            "NextToken": "MORE1",
-        }
-        expected_response = {
-            "ModelPackageSummaryList": [get_package(3)],
-            "NextToken": "MORE2",
-        }
-        stubber.add_response("list_model_packages", expected_response, expected_params)
-        # Version 2 with two more
-        expected_params = {
-            "ModelPackageGroupName": "test-package-group",
-            "ModelApprovalStatus": "Approved",
-            "SortBy": "CreationTime",
-            "MaxResults": 100,
-            "NextToken": "MORE2",
-        }
-        expected_response = {
-            "ModelPackageSummaryList": [
-                get_package(2),
-                get_package(1),
-            ],
-        }
-        stubber.add_response("list_model_packages", expected_response, expected_params)
+        # Version 2 described by group and version
+        expected_params = {"ModelPackageName": "test-package-group/2"}
+        expected_response = get_described_package(2)
+        stubber.add_response(
+            "describe_model_package", expected_response, expected_params
+        )
+        # Version 1 described by group and version
+        expected_params = {"ModelPackageName": "test-package-group/1"}
+        expected_response = get_described_package(1)
+        stubber.add_response(
+            "describe_model_package", expected_response, expected_params
+        )
 
-        # Get model versions
+        # Get model versions, with duplicates only described once
         response = registry.get_versioned_approved_packages(
             model_package_group_name="test-package-group",
-            model_package_versions=[1, 2],
+            model_package_versions=[2, 1, 2],
         )
-        # Expect to get two version
-        assert len(response) == 2
+        # Expect to get versions in order requested
+        assert len(response) == 3
         assert response == [
-            get_package(1),
-            get_package(2),
+            get_described_package(2),
+            get_described_package(1),
+            get_described_package(2),
         ]
 
 
+def test_get_versioned_approved_model_packages_skips_missing():
+    # Create model registry
+    registry = ModelRegistry()
+
+    with Stubber(registry.sm_client) as stubber:
+        # Version 1 is not approved
+        expected_params = {"ModelPackageName": "test-package-group/1"}
+        expected_response = {
+            **get_described_package(1),
+            "ModelApprovalStatus": "Rejected",
+        }
+        stubber.add_response(
+            "describe_model_package", expected_response, expected_params
+        )
+        # Version 9 does not exist
+        expected_params = {"ModelPackageName": "test-package-group/9"}
+        stubber.add_client_error(
+            "describe_model_package",
+            "ValidationException",
+            "ModelPackage does not exist",
+            expected_params=expected_params,
+        )
+        # Version 2 is approved
+        expected_params = {"ModelPackageName": "test-package-group/2"}
+        expected_response = get_described_package(2)
+        stubber.add_response(
+            "describe_model_package", expected_response, expected_params
+        )
+
+        response = registry.get_versioned_approved_packages(
+            model_package_group_name="test-package-group",
+            model_package_versions=[1, 9, 2],
+        )
+        assert response == [get_described_package(2)]
+
+
+def test_empty_versioned_approved_model_packages():
+    # Create model registry
+    registry = ModelRegistry()
+
+    with Stubber(registry.sm_client) as stubber:
+        expected_params = {"ModelPackageName": "test-package-group/9"}
+        stubber.add_client_error(
+            "describe_model_package",
+            "ValidationException",
+            "ModelPackage does not exist",
+            expected_params=expected_params,
+        )
+
+        # Expect error when no versions found
+        with pytest.raises(Exception):
+            registry.get_versioned_approved_packages(
+                model_package_group_name="test-package-group",
+                model_package_versions=[9],
+            )
+
+
+def test_versioned_approved_model_packages_raises_validation_error():
+    # Create model registry
+    registry = ModelRegistry()
+
+    with Stubber(registry.sm_client) as stubber:
+        expected_params = {"ModelPackageName": "test-package-group/1"}
+        stubber.add_client_error(
+            "describe_model_package",
+            "ValidationException",
+            "Invalid model package name",
+            expected_params=expected_params,
+        )
+
+        # Expect the validation error rather than a missing version
+        with pytest.raises(Exception, match="Invalid model package name"):
+            registry.get_versioned_approved_packages(
+                model_package_group_name="test-package-group",
+                model_package_versions=[1],
+            )
+
+
 def test_filter_package_version():
     """
     Select the sorted package versions.  Validate we return in the order we ask for.